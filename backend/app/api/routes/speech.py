@@ -1,6 +1,8 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from app.services.speech_service import SpeechService
 from app.services.grading_service import GradingService
+from app.services.admission_service import admit_request
+from app.services.usage_service import usage_ledger
 from app.schemas.speech import SpeechAnalysisResponse, SpeechGradingResponse
 from typing import Optional
 
@@ -12,12 +14,14 @@ grading_service = GradingService()
 @router.post("/analyze", response_model=SpeechAnalysisResponse)
 async def analyze_speech(
     audio: UploadFile = File(...),
-    user_id: Optional[str] = None
+    user_id: Optional[str] = None,
+    user_key: str = Depends(admit_request)
 ):
     """
     Analyze speech from audio file using OpenAI Whisper.
     Returns transcription and basic analysis.
     """
+    usage = {}
     try:
         # Validate audio file
         if not audio.content_type or not audio.content_type.startswith('audio/'):
@@ -27,13 +31,13 @@ async def analyze_speech(
         audio_data = await audio.read()
         
         # Transcribe using Whisper
-        transcription = await speech_service.transcribe_audio(audio_data, audio.filename)
+        transcription = await speech_service.transcribe_audio(audio_data, audio.filename, usage)
         
         if not transcription:
             raise HTTPException(status_code=500, detail="Failed to transcribe audio")
         
         # Get speech analysis and grading
-        grading_result = await grading_service.grade_speech(transcription)
+        grading_result = await grading_service.grade_speech(transcription, usage)
         
         return SpeechAnalysisResponse(
             transcription=transcription,
@@ -45,14 +49,18 @@ async def analyze_speech(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing speech: {str(e)}")
+    finally:
+        if usage:
+            usage_ledger.record(user_key, "analyze", usage)
 
 
 @router.post("/grade", response_model=SpeechGradingResponse)
-async def grade_speech_text(text: dict):
+async def grade_speech_text(text: dict, user_key: str = Depends(admit_request)):
     """
     Grade speech quality from transcribed text.
     Accepts JSON with 'text' field.
     """
+    usage = {}
     try:
         transcription = text.get("text", "")
         
@@ -60,7 +68,7 @@ async def grade_speech_text(text: dict):
             raise HTTPException(status_code=400, detail="Text cannot be empty")
         
         # Grade the speech
-        grading_result = await grading_service.grade_speech(transcription)
+        grading_result = await grading_service.grade_speech(transcription, usage)
         
         return SpeechGradingResponse(**grading_result)
     
@@ -68,3 +76,6 @@ async def grade_speech_text(text: dict):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error grading speech: {str(e)}")
+    finally:
+        if usage:
+            usage_ledger.record(user_key, "grade", usage)
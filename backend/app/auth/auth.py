@@ -6,6 +6,7 @@ import httpx
 
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 class Auth0Verifier:
@@ -16,6 +17,9 @@ class Auth0Verifier:
         self.api_audience = settings.AUTH0_API_AUDIENCE
         self.issuer = settings.AUTH0_ISSUER
         self.algorithms = [settings.AUTH0_ALGORITHMS]
+        # For MVP only - MUST enable in production. While False, token claims are
+        # not trustworthy and must not be used to key rate limits or billing.
+        self.verify_signature = False
     
     async def get_jwks(self):
         """Fetch JSON Web Key Set from Auth0."""
@@ -46,7 +50,7 @@ class Auth0Verifier:
                 algorithms=self.algorithms,
                 audience=self.api_audience,
                 issuer=self.issuer,
-                options={"verify_signature": False}  # For MVP only - MUST enable in production
+                options={"verify_signature": self.verify_signature}
             )
             
             return payload
@@ -78,7 +82,7 @@ async def get_current_user(
 
 
 async def get_optional_user(
-    credentials: HTTPAuthorizationCredentials = Security(security, auto_error=False)
+    credentials: HTTPAuthorizationCredentials = Security(optional_security)
 ) -> dict | None:
     """
     Dependency to optionally get authenticated user.
@@ -25,6 +25,21 @@ class Settings(BaseSettings):
     AUTH0_ISSUER: str = ""
     AUTH0_ALGORITHMS: str = "RS256"
     
+    # Admission control
+    ADMISSION_MAX_CONCURRENCY: int = 8
+    ADMISSION_USER_RATE: float = 0.2  # Requests per second refilled into each user's bucket
+    ADMISSION_USER_BURST: int = 5
+    ADMISSION_ANONYMOUS_RATE: float = 0.2  # Requests per second for each anonymous client address
+    ADMISSION_ANONYMOUS_BURST: int = 5
+    TRUSTED_PROXIES: List[str] = []  # Proxy addresses whose X-Forwarded-For header is trusted
+    ADMISSION_MAX_QUEUE: int = 100
+    ADMISSION_QUEUE_TIMEOUT: float = 30.0
+    
+    # Usage ledger
+    USAGE_LEDGER_BATCH_SIZE: int = 50
+    USAGE_LEDGER_FLUSH_INTERVAL: float = 5.0
+    USAGE_LEDGER_MAX_BUFFER: int = 10000
+    
     # Application
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
     ENVIRONMENT: str = "development"
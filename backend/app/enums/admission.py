@@ -0,0 +1,5 @@
+from enum import Enum
+
+class RequestPriority(Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
@@ -1,13 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.config import settings
 from app.api.routers import router
+from app.services.usage_service import usage_ledger
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await usage_ledger.start()
+    yield
+    await usage_ledger.stop()
+
 
 app = FastAPI(
     title="Speech Rater API",
     description="API for analyzing and grading speech quality",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Configuration
@@ -20,6 +20,7 @@ CREATE TABLE IF NOT EXISTS speech_recordings (
     duration_seconds DECIMAL(10, 2),
     word_count INT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     INDEX idx_user_id (user_id),
     INDEX idx_created_at (created_at)
@@ -36,6 +37,7 @@ CREATE TABLE IF NOT EXISTS speech_grades (
     fluency_score DECIMAL(5, 2) NOT NULL,
     detailed_feedback TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (recording_id) REFERENCES speech_recordings(id) ON DELETE CASCADE,
     INDEX idx_recording_id (recording_id),
     INDEX idx_overall_score (overall_score)
@@ -48,6 +50,7 @@ CREATE TABLE IF NOT EXISTS improvements (
     suggestion TEXT NOT NULL,
     category ENUM('clarity', 'grammar', 'vocabulary', 'fluency', 'general') DEFAULT 'general',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (grade_id) REFERENCES speech_grades(id) ON DELETE CASCADE,
     INDEX idx_grade_id (grade_id),
     INDEX idx_category (category)
@@ -59,6 +62,7 @@ CREATE TABLE IF NOT EXISTS strengths (
     grade_id INT NOT NULL,
     strength TEXT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (grade_id) REFERENCES speech_grades(id) ON DELETE CASCADE,
     INDEX idx_grade_id (grade_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -76,3 +80,18 @@ CREATE TABLE IF NOT EXISTS user_progress (
     INDEX idx_user_id (user_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Per-user upstream usage ledger (user_key is the Auth0 subject, or an anonymous client key)
+CREATE TABLE IF NOT EXISTS usage_records (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_key VARCHAR(255) NOT NULL,
+    endpoint VARCHAR(255) NOT NULL,
+    prompt_tokens INT NOT NULL DEFAULT 0,
+    completion_tokens INT NOT NULL DEFAULT 0,
+    audio_seconds DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    upstream_latency_ms INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_user_key (user_key),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
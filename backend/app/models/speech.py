@@ -15,7 +15,8 @@ class SpeechRecording(BaseModel):
     word_count = Column(Integer)
     
     user = relationship('User', back_populates='speech_recordings')
-    speech_grade = relationship('SpeechGrade', back_populates='recording', uselist=False, cascade='all, delete-orphan')
+    # Re-grading adds a grade per run, so the newest grade comes first
+    speech_grades = relationship('SpeechGrade', back_populates='recording', order_by='SpeechGrade.id.desc()', cascade='all, delete-orphan')
 
 
 class SpeechGrade(BaseModel):
@@ -36,18 +37,18 @@ class SpeechGrade(BaseModel):
 
 
 class SpeechGradeImprovement(BaseModel):
-    __tablename__ = "speech_grade_improvements"
+    __tablename__ = "improvements"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     grade_id = Column(Integer, ForeignKey('speech_grades.id', ondelete='CASCADE'), nullable=False)
     suggestion = Column(Text, nullable=False)
-    category = Column(Enum(SpeechGradeImprovementCategory), default=SpeechGradeImprovementCategory.GENERAL, nullable=False)
+    category = Column(Enum(SpeechGradeImprovementCategory, values_callable=lambda categories: [c.value for c in categories]), default=SpeechGradeImprovementCategory.GENERAL, nullable=False)
 
     grade = relationship('SpeechGrade', back_populates='improvements')
 
 
 class SpeechGradeStrength(BaseModel):
-    __tablename__ = "speech_grade_strengths"
+    __tablename__ = "strengths"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     grade_id = Column(Integer, ForeignKey('speech_grades.id', ondelete='CASCADE'), nullable=False)
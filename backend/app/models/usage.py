@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DECIMAL
+
+from app.models.base import BaseModel
+
+class UsageRecord(BaseModel):
+    __tablename__ = "usage_records"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_key = Column(String(255), nullable=False, index=True)
+    endpoint = Column(String(255), nullable=False)
+    prompt_tokens = Column(Integer, default=0, nullable=False)
+    completion_tokens = Column(Integer, default=0, nullable=False)
+    audio_seconds = Column(DECIMAL(10, 2), default=0, nullable=False)
+    upstream_latency_ms = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,266 @@
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from fastapi import HTTPException, Depends, Header, Request
+from app.auth.auth import auth_verifier, get_optional_user
+from app.config import settings
+from app.enums.admission import RequestPriority
+import asyncio
+import math
+import time
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        """
+        Refill the bucket and check whether a token is available.
+
+        Returns:
+            0 if a token is available, otherwise seconds until one is
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            return 0.0
+
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+
+class AdmissionController:
+    """
+    Admission control for requests that call upstream APIs.
+
+    Each user gets a token bucket limiting their request rate; anonymous clients,
+    keyed by address, get buckets with their own limits. A claimed but unverified
+    user id can be limited by its own bucket on top of the address bucket. At most
+    MAX_BUCKETS buckets are kept, evicting the least recently used. Admitted
+    requests then share a global concurrency cap. When it is full, requests wait
+    in one lane per priority; interactive waiters are always served before batch
+    waiters, and within a lane users are served round-robin so one user cannot
+    starve others.
+    """
+
+    MAX_BUCKETS = 10000
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.ADMISSION_MAX_CONCURRENCY,
+        user_rate: float = settings.ADMISSION_USER_RATE,
+        user_burst: int = settings.ADMISSION_USER_BURST,
+        anonymous_rate: float = settings.ADMISSION_ANONYMOUS_RATE,
+        anonymous_burst: int = settings.ADMISSION_ANONYMOUS_BURST,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT
+    ):
+        self.max_concurrency = max_concurrency
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.anonymous_rate = anonymous_rate
+        self.anonymous_burst = anonymous_burst
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.active = 0
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        # Lanes in service order; each maps user key -> that user's waiting futures
+        self._lanes: dict[RequestPriority, OrderedDict[str, deque]] = {
+            priority: OrderedDict() for priority in RequestPriority
+        }
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for lane in self._lanes.values() for waiters in lane.values())
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        user_key: str,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        anonymous: bool = False,
+        claimed_user: str | None = None
+    ):
+        """
+        Hold a concurrency slot for the duration of the block.
+        Anonymous keys are rate limited with the anonymous bucket limits.
+        If `claimed_user` is given, that id's per-user bucket must also have a token.
+
+        Raises:
+            HTTPException: 429 with a Retry-After header if the user is over their
+                rate limit, the queue is full, or the wait exceeds the queue timeout
+        """
+        limits = [(user_key, anonymous)]
+        if claimed_user is not None:
+            limits.append((f"claimed:{claimed_user}", False))
+
+        self._check_rate(limits)
+        await self._acquire(user_key, priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _check_rate(self, limits: list[tuple[str, bool]]) -> None:
+        """
+        Take a token from every (key, anonymous) bucket, or from none of them.
+        Buckets are looked up in order, so a request rejected by an earlier
+        bucket never creates the later ones.
+        """
+        buckets = []
+        for key, anonymous in limits:
+            bucket = self._get_bucket(key, anonymous)
+            retry_after = bucket.retry_after()
+            if retry_after > 0:
+                raise self._too_many_requests("Rate limit exceeded", retry_after)
+            buckets.append(bucket)
+
+        for bucket in buckets:
+            bucket.consume()
+
+    def _get_bucket(self, key: str, anonymous: bool) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets.move_to_end(key)
+            return bucket
+
+        if len(self._buckets) >= self.MAX_BUCKETS:
+            # Evict the least recently used bucket so new keys cannot grow memory without bound
+            self._buckets.popitem(last=False)
+
+        if anonymous:
+            bucket = TokenBucket(self.anonymous_rate, self.anonymous_burst)
+        else:
+            bucket = TokenBucket(self.user_rate, self.user_burst)
+        self._buckets[key] = bucket
+        return bucket
+
+    async def _acquire(self, user_key: str, priority: RequestPriority) -> None:
+        if self.active < self.max_concurrency and self.queued == 0:
+            self.active += 1
+            return
+
+        if self.queued >= self.max_queue:
+            raise self._too_many_requests("Server is busy", self.queue_timeout)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._lanes[priority].setdefault(user_key, deque()).append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                self._remove_waiter(priority, user_key, waiter)
+
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._too_many_requests("Server is busy", self.queue_timeout)
+            raise
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiter, or free it if nobody is waiting."""
+        for lane in self._lanes.values():
+            while lane:
+                user_key, waiters = next(iter(lane.items()))
+                waiter = waiters.popleft()
+
+                # Rotate the user to the back of the lane for round-robin service
+                if waiters:
+                    lane.move_to_end(user_key)
+                else:
+                    del lane[user_key]
+
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+
+        self.active -= 1
+
+    def _remove_waiter(self, priority: RequestPriority, user_key: str, waiter: asyncio.Future) -> None:
+        waiters = self._lanes[priority].get(user_key)
+        if waiters is None:
+            return
+
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+
+        if not waiters:
+            del self._lanes[priority][user_key]
+
+    def _too_many_requests(self, detail: str, retry_after: float) -> HTTPException:
+        return HTTPException(
+            status_code=429,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+admission_controller = AdmissionController()
+
+
+def get_client_address(request: Request) -> str:
+    """
+    Resolve the client address for anonymous rate limiting.
+
+    When the direct peer is a trusted proxy, X-Forwarded-For is walked from the
+    right and the first address that is not a trusted proxy is used, so a client
+    cannot pick its own key by prepending addresses.
+    """
+    address = request.client.host if request.client else "unknown"
+    if address not in settings.TRUSTED_PROXIES:
+        return address
+
+    forwarded = request.headers.get("x-forwarded-for", "")
+    for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+        if hop not in settings.TRUSTED_PROXIES:
+            return hop
+
+    return address
+
+
+async def admit_request(
+    request: Request,
+    user: dict | None = Depends(get_optional_user),
+    x_request_priority: str | None = Header(None)
+):
+    """
+    Dependency that admits a request through the admission controller.
+    Yields the key usage is tracked under: the user id when the token signature
+    is verified, otherwise the client address (see get_client_address). Until
+    signatures are verified, anyone can mint a token with any `sub`, so a claimed
+    user id only adds a per-user limit on top of the address limit. Clients
+    doing bulk work should send `X-Request-Priority: batch` so they queue behind
+    interactive requests.
+
+    Example:
+        @router.post("/analyze")
+        async def analyze(user_key: str = Depends(admit_request)):
+            ...
+    """
+    if user is not None and auth_verifier.verify_signature:
+        user_key, anonymous, claimed_user = user["sub"], False, None
+    else:
+        user_key = f"anonymous:{get_client_address(request)}"
+        anonymous, claimed_user = True, (user.get("sub") if user else None)
+
+    try:
+        priority = RequestPriority((x_request_priority or RequestPriority.INTERACTIVE.value).lower())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid X-Request-Priority header")
+
+    async with admission_controller.admit(user_key, priority, anonymous, claimed_user):
+        yield user_key
@@ -1,44 +1,30 @@
+from concurrent.futures import Executor
 from openai import OpenAI
 from app.config import settings
+import asyncio
+import functools
 import json
 import re
+import time
 
 
 class GradingService:
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(self, client: OpenAI | None = None):
+        self.client = client or OpenAI(api_key=settings.OPENAI_API_KEY)
     
-    async def grade_speech(self, transcription: str) -> dict:
+    async def grade_speech(self, transcription: str, usage: dict | None = None) -> dict:
         """
         Grade speech quality using GPT-3.5 and provide detailed feedback.
         
         Args:
             transcription: The transcribed speech text
+            usage: Optional dictionary to add token counts and upstream_latency_ms to
             
         Returns:
             Dictionary containing scores, strengths, improvements, and feedback
         """
         try:
-            prompt = self._create_grading_prompt(transcription)
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert speech coach and evaluator. Analyze speech transcriptions and provide constructive feedback with specific scores and actionable suggestions."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            # Parse the response
-            result_text = response.choices[0].message.content
+            result_text = await self.request_grading(transcription, usage)
             return self._parse_grading_response(result_text)
         
         except Exception as e:
@@ -46,6 +32,53 @@ class GradingService:
             # Return default scores if API fails
             return self._get_default_grading()
     
+    async def request_grading(
+        self,
+        transcription: str,
+        usage: dict | None = None,
+        executor: Executor | None = None
+    ) -> str:
+        """
+        Ask GPT to grade the speech and return the raw response text.
+        Unlike grade_speech, errors are raised instead of replaced with default scores.
+        
+        Args:
+            transcription: The transcribed speech text
+            usage: Optional dictionary to add token counts and upstream_latency_ms to
+            executor: Thread pool to run the request in (defaults to the loop's default executor)
+            
+        Returns:
+            Raw model response containing the grading JSON
+        """
+        prompt = self._create_grading_prompt(transcription)
+        
+        # The OpenAI client is synchronous, so run it off the event loop
+        started = time.monotonic()
+        response = await asyncio.get_running_loop().run_in_executor(executor, functools.partial(
+            self.client.chat.completions.create,
+            model="gpt-3.5-turbo",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert speech coach and evaluator. Analyze speech transcriptions and provide constructive feedback with specific scores and actionable suggestions."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.7,
+            max_tokens=1000
+        ))
+        
+        if usage is not None:
+            usage["upstream_latency_ms"] = usage.get("upstream_latency_ms", 0) + int((time.monotonic() - started) * 1000)
+            if getattr(response, "usage", None) is not None:
+                usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + response.usage.prompt_tokens
+                usage["completion_tokens"] = usage.get("completion_tokens", 0) + response.usage.completion_tokens
+        
+        return response.choices[0].message.content
+    
     def _create_grading_prompt(self, transcription: str) -> str:
         """Create a detailed prompt for GPT to grade the speech."""
         return f"""Analyze the following speech transcription and provide a detailed evaluation:
@@ -78,28 +111,39 @@ Provide specific, actionable feedback that will help the speaker improve."""
     def _parse_grading_response(self, response_text: str) -> dict:
         """Parse GPT response to extract grading information."""
         try:
-            # Try to extract JSON from the response
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                json_str = json_match.group(0)
-                data = json.loads(json_str)
-                
-                # Validate and ensure all required fields exist
-                return {
-                    "overall_score": float(data.get("overall_score", 75)),
-                    "clarity_score": float(data.get("clarity_score", 75)),
-                    "grammar_score": float(data.get("grammar_score", 75)),
-                    "vocabulary_score": float(data.get("vocabulary_score", 75)),
-                    "fluency_score": float(data.get("fluency_score", 75)),
-                    "strengths": data.get("strengths", [])[:5],  # Limit to 5
-                    "improvements": data.get("improvements", [])[:5],  # Limit to 5
-                    "detailed_feedback": data.get("detailed_feedback", "")
-                }
+            return self.extract_grading(response_text)
         except Exception as e:
             print(f"Error parsing grading response: {str(e)}")
         
         return self._get_default_grading()
     
+    @staticmethod
+    def extract_grading(response_text: str) -> dict:
+        """
+        Extract grading information from a GPT response.
+        
+        Raises:
+            ValueError: If the response contains no valid grading JSON
+        """
+        # Try to extract JSON from the response
+        json_match = re.search(r'\{[\s\S]*\}', response_text or "")
+        if not json_match:
+            raise ValueError("No JSON object found in grading response")
+        
+        data = json.loads(json_match.group(0))
+        
+        # Validate and ensure all required fields exist
+        return {
+            "overall_score": float(data.get("overall_score", 75)),
+            "clarity_score": float(data.get("clarity_score", 75)),
+            "grammar_score": float(data.get("grammar_score", 75)),
+            "vocabulary_score": float(data.get("vocabulary_score", 75)),
+            "fluency_score": float(data.get("fluency_score", 75)),
+            "strengths": data.get("strengths", [])[:5],  # Limit to 5
+            "improvements": data.get("improvements", [])[:5],  # Limit to 5
+            "detailed_feedback": data.get("detailed_feedback", "")
+        }
+    
     def _get_default_grading(self) -> dict:
         """Return default grading when API fails or parsing fails."""
         return {
@@ -0,0 +1,216 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, func, exists
+from sqlalchemy.orm import sessionmaker
+from app.models.speech import SpeechRecording, SpeechGrade, SpeechGradeImprovement, SpeechGradeStrength
+from app.models.usage import UsageRecord
+from app.services.grading_service import GradingService
+from app.services.usage_service import UsageLedger
+import asyncio
+import json
+import os
+import time
+
+
+class RegradeService:
+    """Service for re-grading archived speech recordings in bulk."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        grading_service: GradingService,
+        checkpoint_path: str,
+        batch_size: int = 100,
+        concurrency: int = 8
+    ):
+        self.session_factory = session_factory
+        self.grading_service = grading_service
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    async def run(self, limit: int | None = None, retry_failed: bool = False) -> dict:
+        """
+        Re-grade every recording after the last checkpoint and store new grades.
+
+        Recordings are read in id-ordered batches. Each batch is graded with at most
+        `concurrency` upstream requests in flight, on a thread pool of that size, its grades are inserted in one
+        transaction together with a "regrade" usage record per recording, and then
+        the checkpoint is advanced. The checkpoint also records
+        the highest grade id from before the run started; recordings that already
+        have a newer grade are skipped, so a run interrupted between the insert and
+        the checkpoint write does not grade that batch twice when resumed.
+
+        Args:
+            limit: Optional maximum number of recordings to process in this run
+            retry_failed: Re-grade the recordings listed as failed in the checkpoint
+                instead of continuing after the last checkpointed id
+
+        Returns:
+            Final checkpoint state
+        """
+        state = self.load_checkpoint()
+        if "start_grade_id" not in state:
+            state["start_grade_id"] = self._max_grade_id()
+            self.save_checkpoint(state)
+
+        if retry_failed:
+            pending_ids = list(state["failed_ids"])
+            total = len(pending_ids)
+        else:
+            pending_ids = None
+            total = self._count_pending(state)
+
+        if limit is not None:
+            total = min(total, limit)
+
+        if retry_failed:
+            print(f"Retrying {total} failed recordings")
+        else:
+            print(f"Re-grading {total} recordings after id {state['last_id']}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # The OpenAI client is synchronous; a dedicated pool keeps the default
+        # executor's size from capping concurrency below the requested value
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        still_failing = []
+        processed = 0
+        started = time.monotonic()
+
+        try:
+            while processed < total:
+                size = min(self.batch_size, total - processed)
+                if retry_failed:
+                    chunk = pending_ids[processed:processed + size]
+                    batch = self._fetch_batch(state, SpeechRecording.id.in_(chunk))
+                else:
+                    batch = self._fetch_batch(state, SpeechRecording.id > state["last_id"], size)
+                    if not batch:
+                        break
+                    chunk = batch
+
+                results = await asyncio.gather(*[
+                    self._grade_recording(recording_id, user_id, transcription, semaphore, executor)
+                    for recording_id, user_id, transcription in batch
+                ])
+
+                grades = [(recording_id, grading) for recording_id, grading, _ in results if grading is not None]
+                failed_ids = [recording_id for recording_id, grading, _ in results if grading is None]
+                usage_entries = [entry for _, _, entry in results if entry is not None]
+                self._save_batch(grades, usage_entries)
+
+                state["graded"] += len(grades)
+                if retry_failed:
+                    # Keep failures plus ids not reached yet, so an interrupted retry can continue
+                    still_failing.extend(failed_ids)
+                    state["failed_ids"] = still_failing + pending_ids[processed + len(chunk):]
+                else:
+                    state["last_id"] = batch[-1][0]
+                    state["failed_ids"].extend(failed_ids)
+                self.save_checkpoint(state)
+
+                processed += len(chunk)
+                self._report_progress(processed, total, started, len(failed_ids))
+        finally:
+            executor.shutdown()
+
+        return state
+
+    def load_checkpoint(self) -> dict:
+        """Load the checkpoint file, or return a fresh state if none exists."""
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r') as checkpoint_file:
+                return json.load(checkpoint_file)
+
+        return {"last_id": 0, "graded": 0, "failed_ids": []}
+
+    def save_checkpoint(self, state: dict) -> None:
+        """Atomically write the checkpoint file."""
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _max_grade_id(self) -> int:
+        with self.session_factory() as db:
+            return db.scalar(select(func.max(SpeechGrade.id))) or 0
+
+    def _not_regraded(self, state: dict):
+        """Condition excluding recordings that already have a grade from this run."""
+        return ~exists().where(
+            SpeechGrade.recording_id == SpeechRecording.id,
+            SpeechGrade.id > state["start_grade_id"]
+        )
+
+    def _count_pending(self, state: dict) -> int:
+        with self.session_factory() as db:
+            return db.scalar(
+                select(func.count(SpeechRecording.id))
+                .where(SpeechRecording.id > state["last_id"], self._not_regraded(state))
+            )
+
+    def _fetch_batch(self, state: dict, condition, size: int | None = None) -> list:
+        """Fetch (id, user_id, transcription) rows matching `condition` in id order, skipping regraded ones."""
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(SpeechRecording.id, SpeechRecording.user_id, SpeechRecording.transcription)
+                .where(condition, self._not_regraded(state))
+                .order_by(SpeechRecording.id)
+                .limit(size)
+            )
+            return [tuple(row) for row in rows]
+
+    async def _grade_recording(
+        self,
+        recording_id: int,
+        user_id: str,
+        transcription: str,
+        semaphore: asyncio.Semaphore,
+        executor: ThreadPoolExecutor
+    ) -> tuple:
+        """Grade one recording, returning (recording_id, grading or None, usage entry or None)."""
+        usage = {}
+        grading = None
+        try:
+            async with semaphore:
+                response_text = await self.grading_service.request_grading(transcription, usage, executor)
+
+            grading = GradingService.extract_grading(response_text)
+
+        except Exception as e:
+            print(f"Error re-grading recording {recording_id}: {str(e)}")
+
+        # Tokens spent on responses that failed to parse still count as usage
+        entry = UsageLedger.build_entry(user_id, "regrade", usage) if usage else None
+        return recording_id, grading, entry
+
+    def _save_batch(self, grades: list, usage_entries: list) -> None:
+        """Insert a batch of grades, their strengths and improvements, and usage records in one transaction."""
+        if not grades and not usage_entries:
+            return
+
+        with self.session_factory() as db:
+            db.add_all([UsageRecord(**entry) for entry in usage_entries])
+            db.add_all([
+                SpeechGrade(
+                    recording_id=recording_id,
+                    overall_score=grading["overall_score"],
+                    clarity_score=grading["clarity_score"],
+                    grammar_score=grading["grammar_score"],
+                    vocabulary_score=grading["vocabulary_score"],
+                    fluency_score=grading["fluency_score"],
+                    detailed_feedback=grading["detailed_feedback"],
+                    strengths=[SpeechGradeStrength(strength=str(s)) for s in grading["strengths"]],
+                    improvements=[SpeechGradeImprovement(suggestion=str(s)) for s in grading["improvements"]]
+                )
+                for recording_id, grading in grades
+            ])
+            db.commit()
+
+    def _report_progress(self, processed: int, total: int, started: float, failed: int) -> None:
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        eta = (total - processed) / rate if rate > 0 else 0.0
+        print(
+            f"{processed}/{total} recordings "
+            f"({rate:.1f}/s, ETA {eta:.0f}s, {failed} failed in last batch)"
+        )
@@ -1,5 +1,7 @@
+import asyncio
 import os
 import tempfile
+import time
 from openai import OpenAI
 from app.config import settings
 
@@ -8,13 +10,14 @@ class SpeechService:
     def __init__(self):
         self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
     
-    async def transcribe_audio(self, audio_data: bytes, filename: str) -> str:
+    async def transcribe_audio(self, audio_data: bytes, filename: str, usage: dict | None = None) -> str:
         """
         Transcribe audio using OpenAI Whisper API.
         
         Args:
             audio_data: Raw audio file bytes
             filename: Original filename for proper extension handling
+            usage: Optional dictionary to add audio_seconds and upstream_latency_ms to
             
         Returns:
             Transcribed text
@@ -30,13 +33,20 @@ class SpeechService:
             
             try:
                 # Open the file and send to Whisper
+                # verbose_json includes the audio duration for usage accounting
+                started = time.monotonic()
                 with open(temp_audio_path, 'rb') as audio_file:
-                    transcription = self.client.audio.transcriptions.create(
+                    transcription = await asyncio.to_thread(
+                        self.client.audio.transcriptions.create,
                         model="whisper-1",
                         file=audio_file,
-                        response_format="text"
+                        response_format="verbose_json"
                     )
                 
+                if usage is not None:
+                    usage["upstream_latency_ms"] = usage.get("upstream_latency_ms", 0) + int((time.monotonic() - started) * 1000)
+                    usage["audio_seconds"] = usage.get("audio_seconds", 0) + float(getattr(transcription, "duration", 0) or 0)
+                
                 return transcription.strip() if isinstance(transcription, str) else transcription.text.strip()
             
             finally:
@@ -0,0 +1,122 @@
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.db import SessionLocal
+from app.models.usage import UsageRecord
+import asyncio
+
+
+class UsageLedger:
+    """
+    Buffers per-user upstream usage and writes it to the database in batches.
+
+    Records are flushed when the buffer reaches `batch_size`, every
+    `flush_interval` seconds while the ledger is running, and on stop. Only one
+    flush runs at a time, and entries beyond `max_buffer` are dropped so a
+    database outage cannot grow memory without bound.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        batch_size: int = settings.USAGE_LEDGER_BATCH_SIZE,
+        flush_interval: float = settings.USAGE_LEDGER_FLUSH_INTERVAL,
+        max_buffer: int = settings.USAGE_LEDGER_MAX_BUFFER
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer: list[dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._size_flush: asyncio.Task | None = None
+
+    def record(self, user_key: str, endpoint: str, usage: dict) -> None:
+        """
+        Add a usage entry to the buffer.
+
+        Args:
+            user_key: Authenticated user id, or an anonymous client key
+            endpoint: Name of the endpoint that made the upstream calls
+            usage: Dictionary with prompt_tokens, completion_tokens, audio_seconds
+                and upstream_latency_ms; missing keys count as zero
+        """
+        if len(self._buffer) >= self.max_buffer:
+            self._drop(1)
+            return
+
+        self._buffer.append(self.build_entry(user_key, endpoint, usage))
+
+        # Start a flush unless one is already running
+        if len(self._buffer) >= self.batch_size and (self._size_flush is None or self._size_flush.done()):
+            self._size_flush = asyncio.get_running_loop().create_task(self.flush())
+
+    @staticmethod
+    def build_entry(user_key: str, endpoint: str, usage: dict) -> dict:
+        """Build the UsageRecord column values for a usage dictionary."""
+        return {
+            "user_key": user_key,
+            "endpoint": endpoint,
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "audio_seconds": usage.get("audio_seconds", 0),
+            "upstream_latency_ms": usage.get("upstream_latency_ms", 0)
+        }
+
+    async def flush(self) -> None:
+        """Write all buffered entries in a single transaction."""
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+
+            batch, self._buffer = self._buffer, []
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                print(f"Error writing usage records: {str(e)}")
+                # Keep the entries for the next flush, dropping the oldest past the cap
+                self._buffer = batch + self._buffer
+                overflow = len(self._buffer) - self.max_buffer
+                if overflow > 0:
+                    self._buffer = self._buffer[overflow:]
+                    self._drop(overflow)
+
+    def _drop(self, count: int) -> None:
+        # Log the first drop and then every 1000th to avoid flooding the output
+        if self.dropped % 1000 == 0 or count > 1:
+            print(f"Usage ledger buffer full, dropping entries ({self.dropped + count} dropped so far)")
+        self.dropped += count
+
+    def _write(self, batch: list[dict]) -> None:
+        with self.session_factory() as db:
+            db.add_all([UsageRecord(**entry) for entry in batch])
+            db.commit()
+
+    async def start(self) -> None:
+        """Start the periodic flush task."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush task and write any remaining entries."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        if self._size_flush is not None:
+            await self._size_flush
+            self._size_flush = None
+        await self.flush()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+usage_ledger = UsageLedger()
@@ -0,0 +1,208 @@
+"""
+Fairness load test for the admission controller.
+Run this file to simulate a heavy user flooding the API alongside light
+interactive users and a batch client, with a fake upstream call.
+
+Two passes are run:
+- Scheduling: token buckets are effectively disabled so every request reaches
+  the queue. Light users must be served within a small multiple of the upstream
+  latency, and no batch request may be admitted while an interactive request
+  is waiting.
+- Rate limits: real bucket limits. The heavy user must be rejected with 429 and
+  a Retry-After header, while light users stay under their limit and are never
+  rejected.
+
+Usage:
+    python load_test.py --heavy-requests 200 --light-users 5 --upstream-ms 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import HTTPException
+
+from app.enums.admission import RequestPriority
+from app.services.admission_service import AdmissionController
+
+
+def new_stats(priority: RequestPriority) -> dict:
+    return {
+        "priority": priority,
+        "ok": 0,
+        "rejected": 0,
+        "missing_retry_after": 0,
+        "latencies": [],
+        # (enqueued_at, admitted_at) per admitted request
+        "admissions": []
+    }
+
+
+async def simulate_user(
+    controller: AdmissionController,
+    user_key: str,
+    priority: RequestPriority,
+    requests: int,
+    interval: float,
+    upstream_seconds: float,
+    results: dict
+) -> None:
+    stats = results.setdefault(user_key, new_stats(priority))
+
+    async def one_request():
+        enqueued_at = time.monotonic()
+        try:
+            async with controller.admit(user_key, priority):
+                stats["admissions"].append((enqueued_at, time.monotonic()))
+                # Stand-in for the Whisper/GPT call
+                await asyncio.sleep(upstream_seconds)
+            stats["ok"] += 1
+            stats["latencies"].append(time.monotonic() - enqueued_at)
+        except HTTPException as e:
+            if e.status_code != 429:
+                raise
+            stats["rejected"] += 1
+            if not (e.headers or {}).get("Retry-After"):
+                stats["missing_retry_after"] += 1
+
+    tasks = []
+    for _ in range(requests):
+        tasks.append(asyncio.create_task(one_request()))
+        await asyncio.sleep(interval)
+    await asyncio.gather(*tasks)
+
+
+async def run_scenario(controller: AdmissionController, args: argparse.Namespace) -> dict:
+    upstream_seconds = args.upstream_ms / 1000
+    results = {}
+
+    users = [
+        # The heavy and batch users fire everything at once
+        simulate_user(controller, "heavy", RequestPriority.INTERACTIVE, args.heavy_requests, 0, upstream_seconds, results),
+        simulate_user(controller, "batch", RequestPriority.BATCH, args.heavy_requests, 0, upstream_seconds, results),
+    ]
+    users += [
+        simulate_user(controller, f"light-{i}", RequestPriority.INTERACTIVE, args.light_requests, args.light_interval, upstream_seconds, results)
+        for i in range(args.light_users)
+    ]
+    await asyncio.gather(*users)
+
+    return results
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values) or [0.0]
+    return values[int(fraction * (len(values) - 1))]
+
+
+def report(title: str, results: dict) -> None:
+    print(f"\n{title}")
+    print(f"{'user':<10} {'ok':>5} {'429':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for user_key, stats in sorted(results.items()):
+        p50 = statistics.median(stats["latencies"] or [0.0]) * 1000
+        p95 = percentile(stats["latencies"], 0.95) * 1000
+        print(f"{user_key:<10} {stats['ok']:>5} {stats['rejected']:>5} {p50:>8.0f} {p95:>8.0f}")
+
+
+def light_users(results: dict) -> dict:
+    return {user_key: stats for user_key, stats in results.items() if user_key.startswith("light-")}
+
+
+def check_scheduling(results: dict, args: argparse.Namespace) -> list[str]:
+    """Return the fairness and priority failures of a scheduling pass."""
+    failures = []
+    upstream_seconds = args.upstream_ms / 1000
+
+    for user_key, stats in light_users(results).items():
+        if stats["rejected"]:
+            failures.append(f"{user_key} was rejected {stats['rejected']} times")
+        p95 = percentile(stats["latencies"], 0.95)
+        if p95 > args.max_light_multiple * upstream_seconds:
+            failures.append(
+                f"{user_key} p95 {p95 * 1000:.0f} ms exceeds {args.max_light_multiple}x upstream latency"
+            )
+
+    # A batch request admitted while an interactive request was waiting jumped the lane.
+    # Requests enqueued within half an upstream call of the admission are ignored, since
+    # they can arrive in the same event loop pass as the hand-off.
+    interactive_waits = [
+        admission
+        for stats in results.values() if stats["priority"] == RequestPriority.INTERACTIVE
+        for admission in stats["admissions"]
+    ]
+    grace = upstream_seconds / 2
+    overtakes = sum(
+        1
+        for _, batch_admitted in results["batch"]["admissions"]
+        if any(enqueued < batch_admitted - grace and admitted > batch_admitted for enqueued, admitted in interactive_waits)
+    )
+    if overtakes:
+        failures.append(f"{overtakes} batch requests were admitted while interactive requests were waiting")
+
+    return failures
+
+
+def check_rate_limits(results: dict) -> list[str]:
+    """Return the failures of a rate limit pass."""
+    failures = []
+
+    heavy = results["heavy"]
+    if not heavy["rejected"]:
+        failures.append("heavy user was never rate limited")
+    if heavy["missing_retry_after"]:
+        failures.append(f"{heavy['missing_retry_after']} rejections had no Retry-After header")
+
+    for user_key, stats in light_users(results).items():
+        if stats["rejected"]:
+            failures.append(f"{user_key} was rejected {stats['rejected']} times")
+
+    return failures
+
+
+async def run_load_test(args: argparse.Namespace) -> list[str]:
+    unlimited = args.heavy_requests * 10
+    scheduling = await run_scenario(AdmissionController(
+        max_concurrency=args.concurrency,
+        user_rate=unlimited,
+        user_burst=unlimited,
+        max_queue=unlimited,
+        queue_timeout=args.queue_timeout
+    ), args)
+    report("Scheduling (token buckets disabled)", scheduling)
+
+    rate_limits = await run_scenario(AdmissionController(
+        max_concurrency=args.concurrency,
+        user_rate=args.user_rate,
+        user_burst=args.user_burst,
+        max_queue=unlimited,
+        queue_timeout=args.queue_timeout
+    ), args)
+    report(f"Rate limits ({args.user_rate}/s, burst {args.user_burst})", rate_limits)
+
+    return check_scheduling(scheduling, args) + check_rate_limits(rate_limits)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Admission control fairness load test")
+    parser.add_argument("--concurrency", type=int, default=4, help="Global concurrency cap")
+    parser.add_argument("--user-rate", type=float, default=10.0, help="Per-user token refill rate for the rate limit pass (requests/s)")
+    parser.add_argument("--user-burst", type=int, default=10, help="Per-user bucket capacity for the rate limit pass")
+    parser.add_argument("--queue-timeout", type=float, default=30.0, help="Seconds a request may wait for a slot")
+    parser.add_argument("--heavy-requests", type=int, default=200, help="Requests sent at once by the heavy and batch users")
+    parser.add_argument("--light-users", type=int, default=5, help="Number of light interactive users")
+    parser.add_argument("--light-requests", type=int, default=5, help="Requests per light user")
+    parser.add_argument("--light-interval", type=float, default=0.2, help="Seconds between light user requests")
+    parser.add_argument("--upstream-ms", type=float, default=50.0, help="Simulated upstream latency")
+    parser.add_argument("--max-light-multiple", type=float, default=4.0, help="Allowed light user p95 as a multiple of upstream latency")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    failures = asyncio.run(run_load_test(parse_args()))
+    print()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("PASS: light users were served fairly, batch work yielded, heavy user was rate limited")
+    raise SystemExit(1 if failures else 0)
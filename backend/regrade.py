@@ -0,0 +1,48 @@
+"""
+Bulk re-grading runner for Speech Rater.
+Run this file to re-score archived recordings after changing the grading prompt or model.
+Token usage is written to the usage ledger under the "regrade" endpoint. This process
+calls OpenAI directly, so the API's admission control cannot throttle it; use
+--concurrency to limit its share of the quota.
+
+Usage:
+    python regrade.py --checkpoint regrade.json --concurrency 8
+    python regrade.py --checkpoint regrade.json --retry-failed
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.services.grading_service import GradingService
+from app.services.regrade_service import RegradeService
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-grade archived speech recordings")
+    parser.add_argument("--database-url", default=settings.get_mysql_url(), help="SQLAlchemy database URL")
+    parser.add_argument("--checkpoint", default="regrade_checkpoint.json", help="Checkpoint file used to resume")
+    parser.add_argument("--batch-size", type=int, default=100, help="Recordings fetched and written per batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent grading requests")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum recordings to process in this run")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-grade recordings that failed in earlier runs")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    engine = create_engine(args.database_url, pool_pre_ping=True)
+    regrade_service = RegradeService(
+        session_factory=sessionmaker(autocommit=False, autoflush=False, bind=engine),
+        grading_service=GradingService(),
+        checkpoint_path=args.checkpoint,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency
+    )
+
+    state = asyncio.run(regrade_service.run(limit=args.limit, retry_failed=args.retry_failed))
+    print(f"Done: {state['graded']} graded, {len(state['failed_ids'])} failed, last id {state['last_id']}")
@@ -0,0 +1,176 @@
+"""
+End-to-end check for the bulk re-grading runner.
+Run this file to re-grade a seeded SQLite database with a fake LLM client,
+exercising a limited run, a crash between a batch commit and its checkpoint,
+a resume, and --retry-failed.
+
+Every recording must end with exactly one new grade, earlier grades must be
+left untouched, and every upstream call must have a "regrade" usage record.
+
+Usage:
+    python regrade_test.py --recordings 250 --batch-size 40 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.users import User
+from app.models.speech import SpeechRecording, SpeechGrade
+from app.models.usage import UsageRecord
+from app.services.grading_service import GradingService
+from app.services.regrade_service import RegradeService
+
+
+class FakeCompletions:
+    """Stand-in for client.chat.completions that grades without calling OpenAI."""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail_unparseable = True
+
+    def create(self, **kwargs):
+        self.calls += 1
+        prompt = kwargs["messages"][1]["content"]
+
+        if self.fail_unparseable and "UNPARSEABLE" in prompt:
+            content = "Sorry, I cannot grade this."
+        else:
+            content = json.dumps({
+                "overall_score": 88,
+                "clarity_score": 80,
+                "grammar_score": 90,
+                "vocabulary_score": 85,
+                "fluency_score": 87,
+                "strengths": ["Clear structure"],
+                "improvements": ["Fewer filler words"],
+                "detailed_feedback": "Good speech."
+            })
+
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20),
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+
+class SimulatedCrash(Exception):
+    pass
+
+
+def seed_database(session_factory: sessionmaker, recordings: int, unparseable: set) -> None:
+    with session_factory() as db:
+        db.add(User(id="user-1", email="user@example.com", first_name="Test", last_name="User"))
+        db.add_all([
+            SpeechRecording(user_id="user-1", transcription="UNPARSEABLE" if i in unparseable else f"Speech number {i}")
+            for i in range(recordings)
+        ])
+        db.flush()
+
+        # A grade from an earlier prompt version, which re-grading must leave alone
+        db.add(SpeechGrade(
+            recording_id=1, overall_score=50, clarity_score=50, grammar_score=50,
+            vocabulary_score=50, fluency_score=50, detailed_feedback="Old grade"
+        ))
+        db.commit()
+
+
+async def run_check(args: argparse.Namespace, workdir: str) -> list[str]:
+    failures = []
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'regrade.sqlite')}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    unparseable = {3, args.recordings // 2}
+    seed_database(session_factory, args.recordings, unparseable)
+
+    completions = FakeCompletions()
+    service = RegradeService(
+        session_factory=session_factory,
+        grading_service=GradingService(client=SimpleNamespace(chat=SimpleNamespace(completions=completions))),
+        checkpoint_path=os.path.join(workdir, "checkpoint.json"),
+        batch_size=args.batch_size,
+        concurrency=args.concurrency
+    )
+
+    # 1. Limited run
+    state = await service.run(limit=args.batch_size)
+    if state["last_id"] != args.batch_size:
+        failures.append(f"limited run stopped at id {state['last_id']}, expected {args.batch_size}")
+
+    # 2. Crash after the next batch is committed but before its checkpoint is written
+    save_checkpoint = service.save_checkpoint
+
+    def crash_on_save(state):
+        raise SimulatedCrash()
+
+    service.save_checkpoint = crash_on_save
+    try:
+        await service.run(limit=args.batch_size)
+        failures.append("simulated crash did not happen")
+    except SimulatedCrash:
+        pass
+    service.save_checkpoint = save_checkpoint
+
+    # 3. Resume to the end
+    state = await service.run()
+    if sorted(state["failed_ids"]) != sorted(i + 1 for i in unparseable):
+        failures.append(f"failed_ids {state['failed_ids']} do not match the unparseable recordings")
+
+    # 4. Retry the failures once the model answers properly
+    completions.fail_unparseable = False
+    state = await service.run(retry_failed=True)
+    if state["failed_ids"]:
+        failures.append(f"recordings still failing after retry: {state['failed_ids']}")
+
+    with session_factory() as db:
+        new_grades = dict(db.execute(
+            select(SpeechGrade.recording_id, func.count(SpeechGrade.id))
+            .where(SpeechGrade.id > state["start_grade_id"])
+            .group_by(SpeechGrade.recording_id)
+        ).all())
+        recording_ids = db.scalars(select(SpeechRecording.id)).all()
+        wrong = {recording_id: new_grades.get(recording_id, 0) for recording_id in recording_ids if new_grades.get(recording_id, 0) != 1}
+        if wrong:
+            failures.append(f"{len(wrong)} recordings do not have exactly one new grade, e.g. {dict(list(wrong.items())[:5])}")
+
+        old_grades = db.scalar(select(func.count(SpeechGrade.id)).where(SpeechGrade.id <= state["start_grade_id"]))
+        if old_grades != 1:
+            failures.append(f"expected the earlier grade to be kept, found {old_grades}")
+
+        newest = db.get(SpeechRecording, 1).speech_grades[0]
+        if newest.detailed_feedback == "Old grade":
+            failures.append("speech_grades does not list the new grade first")
+
+        usage_records = db.scalar(select(func.count(UsageRecord.id)).where(UsageRecord.endpoint == "regrade"))
+        if usage_records != completions.calls:
+            failures.append(f"{usage_records} usage records for {completions.calls} upstream calls")
+
+    print(f"\n{len(recording_ids)} recordings, {completions.calls} upstream calls, {usage_records} usage records")
+    return failures
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end check for bulk re-grading")
+    parser.add_argument("--recordings", type=int, default=250, help="Recordings to seed")
+    parser.add_argument("--batch-size", type=int, default=40, help="Recordings fetched and written per batch")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum concurrent grading requests")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        failures = asyncio.run(run_check(args, workdir))
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("PASS: every recording has exactly one new grade and all usage was recorded")
+    raise SystemExit(1 if failures else 0)